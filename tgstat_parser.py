@@ -2,39 +2,172 @@
 # -*- coding: utf-8 -*-
 
 import argparse
+import asyncio
+import concurrent.futures
 import csv
+import functools
+import heapq
+import io
 import logging
+import logging.handlers
 import os
 import random
 import re
 import sys
-import time
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 
 try:
     from curl_cffi import requests
+    from curl_cffi.requests import AsyncSession
     from fake_useragent import UserAgent
-    from selectolax.parser import HTMLParser
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
     from dotenv import load_dotenv
-    from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 except ImportError as e:
     print(f"❌ Ошибка импорта: {e}")
     print("Установите зависимости: pip install -r requirements.txt")
     sys.exit(1)
 
+try:
+    import pandas as pd
+except ImportError:
+    # pandas опционален — без него подписчики нормализуются построчно
+    pd = None
+
+
+class RateLimited(Exception):
+    """429 от сервера — стоит подождать и повторить запрос"""
+
+
+class TransientHTTP(Exception):
+    """Временная ошибка HTTP (403/5xx) — запрос имеет смысл повторить"""
+
+
+# Предкомпилированные регулярки — в горячем цикле парсинга карточек
+# re.search/re.sub со строковыми литералами вызываются сотни раз на страницу
+_RE_TITLE_SUBS = re.compile(r'\d+[\d\s]*подписчик')
+_RE_TITLE_CAT = re.compile(r'[А-Я][а-я]+ и [А-Я][А-Я]+$')
+_RE_USERNAME_URL = re.compile(r'/(channel|chat)/@([^/]+)')
+_RE_SUBS = re.compile(r'(\d[\d\s]*\d|\d+)\s*подписчиков?')
+_RE_NUMBERS = re.compile(r'(\d[\d\s]{3,})')
+_RE_PAGE = re.compile(r'page=(\d+)')
+_RE_PAGE_SUB = re.compile(r'page=\d+')
+_RE_AT_USERNAME = re.compile(r'@([a-zA-Z0-9_]+)')
+
+# CSS-селекторы горячего цикла — единые сгруппированные строки, чтобы
+# каждый обход дерева выполнялся одним запросом
+_CARDS_SEL = 'div[class*="peer"], div[class*="channel"], div[class*="rating"]'
+_CHANNEL_LINK_SEL = 'a[href*="/channel/"], a[href*="/chat/"]'
+_SUBS_SEL = 'div.text-truncate, .font-16, .small'
+_PAGE_LINK_SEL = 'a[href*="page="]'
+_TME_LINK_SEL = 'a[href*="t.me"]'
+_DATA_USERNAME_SEL = '[data-username]'
+
+
+@functools.lru_cache(maxsize=4096)
+def _normalize_subscribers(text: str) -> int:
+    """Чистая нормализация счетчика подписчиков.
+
+    Один проход по символам без регулярок и float: накапливаем целое,
+    считаем цифры после точки/запятой и масштабируем по суффиксу K/M.
+    Строки вида "1.2K"/"45 678" массово повторяются между страницами,
+    поэтому результат кэшируется.
+    """
+    n = 0
+    frac = 0
+    scale = 1
+    seen_dot = False
+    seen_digit = False
+    for c in text:
+        if '0' <= c <= '9':
+            n = n * 10 + (ord(c) - 48)
+            seen_digit = True
+            if seen_dot:
+                frac += 1
+        elif c in '.,':
+            seen_dot = True
+            frac = 0
+        elif c in 'kK':
+            scale = 1_000
+            break
+        elif c in 'mM':
+            scale = 1_000_000
+            break
+        elif seen_digit and not c.isspace():
+            # Число закончилось, дальше пошел текст; любые пробельные
+            # разделители разрядов (включая \xa0 и  ) пропускаем
+            break
+
+    if scale > 1:
+        return (n * scale) // (10 ** frac)
+    if seen_dot and frac == 3:
+        # Точка/запятая с тремя цифрами после — разделитель тысяч
+        return n
+    return n // (10 ** frac) if frac else n
+
+
+class RateLimiter:
+    """Асинхронный лимитер частоты запросов к одному хосту.
+
+    Гарантирует минимальный интервал (с джиттером) между запросами, но в
+    отличие от сквозной задержки перед каждым запросом не блокирует
+    остальные корутины: пока одна ждет свой слот, другие парсят.
+    """
+
+    def __init__(self, rps: float, jitter: float = 0.0):
+        self._interval = 1.0 / rps
+        self._jitter = jitter
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            wait = max(0.0, self._next - now)
+            self._next = now + wait + self._interval + random.uniform(0, self._jitter)
+        await asyncio.sleep(wait)
+
 
 class TGStatParser:
+    # Статичная часть заголовков — собирается один раз, а не на каждый запрос
+    _BASE_HEADERS = {
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
+        "Accept-Language": "ru-RU,ru;q=0.9,en;q=0.8",
+        "Accept-Encoding": "gzip, deflate, br",
+        "DNT": "1",
+        "Upgrade-Insecure-Requests": "1",
+        "Sec-Fetch-Dest": "document",
+        "Sec-Fetch-Mode": "navigate",
+        "Sec-Fetch-Site": "none",
+        "Sec-Fetch-User": "?1",
+        "Cache-Control": "max-age=0",
+        "Referer": "https://tgstat.ru/",
+        "Origin": "https://tgstat.ru"
+    }
+
     def __init__(self, proxy: Optional[str] = None, delay_base: float = 0.8, delay_jitter: float = 0.4):
         self.base_url = "https://tgstat.ru"
-        self.session = requests.Session(impersonate="chrome110")
+        self.max_concurrency = int(os.getenv("CONCURRENCY", 5))
+        # Весь трафик идет на tgstat.ru — пул соединений с keep-alive
+        # экономит TCP+TLS рукопожатие на каждой странице
+        self.session = AsyncSession(impersonate="chrome110",
+                                    max_clients=self.max_concurrency)
+        self.session.headers.update({"Connection": "keep-alive"})
         self.ua = UserAgent()
+        # fake_useragent перечитывает свою базу на каждый .random —
+        # набираем пул один раз и дальше выбираем из него
+        self._ua_pool = tuple(self.ua.random for _ in range(32))
         self.delay_base = delay_base
         self.delay_jitter = delay_jitter
+        # Семантика --delay сохраняется: один запрос в delay_base секунд
+        self.limiter = RateLimiter(1.0 / delay_base, delay_jitter)
         self.proxy = proxy
-        self.channels_data: Set[Tuple[str, int, str]] = set()  # title, subscribers, link
-        self.chats_data: Set[Tuple[str, int, str]] = set()  # title, subscribers, link
+        # Дедупликация по ссылке: link -> (title, subscribers); при повторе
+        # канала на разных страницах остается максимальный счетчик
+        self.channels_data: Dict[str, Tuple[str, int]] = {}
+        self.chats_data: Dict[str, Tuple[str, int]] = {}
         
         # Настройка сессии с дополнительными куками
         self.session.cookies.update({
@@ -49,18 +182,26 @@ class TGStatParser:
             
         # Настройка логирования
         self.setup_logging()
-        
-        # Предзапрос на главную страницу для получения куков
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        # Одна сессия живет весь прогон — закрываем пул соединений на выходе
+        await self.session.close()
+
+    async def warmup(self):
+        """Предзапрос на главную страницу для получения куков"""
         try:
-            main_response = self.session.get("https://tgstat.ru/", 
-                                           headers=self.get_random_headers(), 
-                                           timeout=10)
+            main_response = await self.session.get("https://tgstat.ru/",
+                                                   headers=self.get_random_headers(),
+                                                   timeout=10)
             if main_response.status_code == 200:
                 self.logger.info("✅ Получены куки с главной страницы")
-            time.sleep(2)  # Небольшая пауза
+            await asyncio.sleep(2)  # Небольшая пауза
         except Exception as e:
             self.logger.warning(f"⚠️ Не удалось получить куки: {e}")
-        
+
     def setup_logging(self):
         """Настройка логирования в файл и консоль"""
         # Создаем папку для логов
@@ -77,10 +218,14 @@ class TGStatParser:
         # Формат для логов
         formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
         
-        # Файловый handler
+        # Файловый handler за буфером: записи копятся в памяти и уходят на
+        # диск пачками (или сразу при WARNING+), а не по одной на каждый
+        # logger.info из горячего пути
         file_handler = logging.FileHandler(logs_dir / "app.log", encoding='utf-8')
         file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
+        buffered_handler = logging.handlers.MemoryHandler(
+            capacity=1024, target=file_handler, flushLevel=logging.WARNING)
+        self.logger.addHandler(buffered_handler)
         
         # Консольный handler
         console_handler = logging.StreamHandler(sys.stdout)
@@ -89,194 +234,227 @@ class TGStatParser:
         
     def get_random_headers(self) -> Dict[str, str]:
         """Генерация случайных заголовков для антибот защиты"""
-        return {
-            "User-Agent": self.ua.random,
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
-            "Accept-Language": "ru-RU,ru;q=0.9,en;q=0.8",
-            "Accept-Encoding": "gzip, deflate, br",
-            "DNT": "1",
-            "Connection": "keep-alive",
-            "Upgrade-Insecure-Requests": "1",
-            "Sec-Fetch-Dest": "document",
-            "Sec-Fetch-Mode": "navigate",
-            "Sec-Fetch-Site": "none",
-            "Sec-Fetch-User": "?1",
-            "Cache-Control": "max-age=0",
-            "Referer": "https://tgstat.ru/",
-            "Origin": "https://tgstat.ru"
-        }
-
-    def random_delay(self):
-        """Случайная задержка с джиттером"""
-        delay = self.delay_base + random.uniform(0, self.delay_jitter)
-        time.sleep(delay)
-        
-    def long_delay(self):
+        return {**self._BASE_HEADERS, "User-Agent": random.choice(self._ua_pool)}
+
+    async def long_delay(self):
         """Длинная задержка при обнаружении блокировки"""
         delay = 10 + random.uniform(0, 10)
         self.logger.info(f"⏰ Длинная пауза: {delay:.1f} сек...")
-        time.sleep(delay)
+        await asyncio.sleep(delay)
+
+    async def make_request(self, url: str, attempts: int = 4) -> Optional[requests.Response]:
+        """Выполнение HTTP запроса с ретраями.
+
+        Ретраи крутятся прямо здесь через asyncio.sleep, чтобы во время
+        бэкоффа остальные корутины продолжали работать: 429 ждет
+        Retry-After, 403/5xx и сетевые сбои — экспоненциальный бэкофф
+        с джиттером. Баги парсинга ретраи не запускают.
+        """
+        last_error = None
+        for attempt in range(attempts):
+            try:
+                await self.limiter.acquire()
+                headers = self.get_random_headers()
+                # Ленивое %s-форматирование: строка не собирается, когда DEBUG выключен
+                self.logger.debug("🌐 Запрос к: %s", url)
+
+                # Раздельный таймаут: 5 сек на соединение, 30 сек на чтение
+                response = await self.session.get(url, headers=headers, timeout=(5, 30))
+            except requests.RequestsError as e:
+                last_error = e
+                self.logger.warning(f"⚠️ Сетевая ошибка ({e}), попытка {attempt + 1}/{attempts}")
+                await asyncio.sleep(0.2 * (2 ** attempt) + random.uniform(0, 0.5))
+                continue
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10),
-           retry=retry_if_exception_type((Exception,)))
-    def make_request(self, url: str) -> Optional[requests.Response]:
-        """Выполнение HTTP запроса с обработкой ошибок и ретраями"""
-        try:
-            headers = self.get_random_headers()
-            self.logger.info(f"🌐 Запрос к: {url}")
-            
-            response = self.session.get(url, headers=headers, timeout=30)
-            
             if response.status_code == 429:
-                self.logger.warning("⚠️ Rate limit (429), увеличиваем задержку...")
-                time.sleep(10 + random.uniform(0, 10))
-                raise Exception("Rate limit exceeded")
-            
+                # Сервер сам говорит, сколько ждать — верим Retry-After
+                retry_after = response.headers.get("Retry-After")
+                try:
+                    wait_seconds = float(retry_after)
+                except (TypeError, ValueError):
+                    wait_seconds = 10 + random.uniform(0, 10)
+                self.logger.warning(f"⚠️ Rate limit (429), пауза {wait_seconds:.1f} сек...")
+                last_error = RateLimited("Rate limit exceeded")
+                await asyncio.sleep(wait_seconds)
+                continue
+
             if response.status_code == 403:
                 self.logger.warning("⚠️ Доступ запрещен (403), увеличиваем задержку...")
-                time.sleep(15 + random.uniform(0, 15))
-                raise Exception("Access forbidden")
-            
+                last_error = TransientHTTP("Access forbidden")
+                await asyncio.sleep(15 + random.uniform(0, 15))
+                continue
+
+            if 500 <= response.status_code < 600:
+                self.logger.warning(f"⚠️ Серверная ошибка HTTP {response.status_code}: {url}")
+                last_error = TransientHTTP(f"HTTP {response.status_code}")
+                await asyncio.sleep(0.2 * (2 ** attempt) + random.uniform(0, 0.5))
+                continue
+
             if response.status_code not in [200, 404]:
+                # Неожиданный статус (400/401/410/...) ретраить бессмысленно —
+                # страницу пропускаем, остальной прогон продолжается
                 self.logger.error(f"❌ HTTP {response.status_code}: {url}")
-                response.raise_for_status()
-                
+                return None
+
             return response
-        except Exception as e:
-            self.logger.error(f"❌ Ошибка запроса {url}: {e}")
-            raise
+
+        self.logger.error(f"❌ Ошибка запроса {url}: {last_error}")
+        return None
 
     def normalize_subscribers(self, text: str) -> int:
         """Нормализация количества подписчиков в числовой формат"""
         if not text:
             return 0
-            
-        # Убираем все символы кроме цифр, точек, запятых и букв K/M
-        text = re.sub(r'[^\d.,KMkm]', '', text.strip())
-        
-        if not text:
-            return 0
-            
-        # Заменяем запятые на точки для единообразия
-        text = text.replace(',', '.')
-        
-        try:
-            # Обработка K (тысячи) и M (миллионы)
-            if text.lower().endswith('k'):
-                number = float(text[:-1])
-                return int(number * 1000)
-            elif text.lower().endswith('m'):
-                number = float(text[:-1]) 
-                return int(number * 1000000)
-            else:
-                # Обычное число, убираем точки если они разделители тысяч
-                if '.' in text and len(text.split('.')[-1]) == 3:
-                    # Скорее всего разделитель тысяч
-                    text = text.replace('.', '')
-                return int(float(text))
-        except (ValueError, IndexError):
-            self.logger.warning(f"⚠️ Не удалось конвертировать подписчиков: {text}")
-            return 0
+        return _normalize_subscribers(text)
 
-    def extract_telegram_link(self, card_html: str, tgstat_url: str = "") -> str:
-        """Извлечение прямой ссылки на Telegram канал/чат"""
-        parser = HTMLParser(card_html)
-        
-        # Ищем прямые ссылки на t.me
-        tme_links = parser.css('a[href*="t.me"]')
-        if tme_links:
-            href = tme_links[0].attributes.get('href', '')
+    def extract_telegram_link(self, card_node, tgstat_url: str = "") -> str:
+        """Извлечение прямой ссылки на Telegram канал/чат из узла карточки"""
+        # Работаем прямо на уже распарсенном узле — без повторной
+        # сериализации card.html и построения второго DOM
+        tme_link = card_node.css_first(_TME_LINK_SEL)
+        if tme_link:
+            href = tme_link.attributes.get('href', '')
             if href.startswith('https://t.me/'):
                 return href
-                
+
         # Ищем в data-атрибутах или скрытых полях
-        data_attrs = parser.css('[data-username]')
-        if data_attrs:
-            username = data_attrs[0].attributes.get('data-username', '').strip('@')
+        data_attr = card_node.css_first(_DATA_USERNAME_SEL)
+        if data_attr:
+            username = data_attr.attributes.get('data-username', '').strip('@')
             if username:
                 return f"https://t.me/{username}"
-        
+
         # Ищем в тексте username формата @username
-        text_content = parser.text()
-        username_match = re.search(r'@([a-zA-Z0-9_]+)', text_content)
+        username_match = _RE_AT_USERNAME.search(card_node.text())
         if username_match:
             username = username_match.group(1)
             return f"https://t.me/{username}"
-            
+
         # В крайнем случае используем tgstat url с пометкой
         if tgstat_url:
             return f"{tgstat_url} (tgstat)"
-            
+
         return ""
 
-    def parse_page(self, url: str) -> Tuple[List[Dict], bool]:
-        """Парсинг одной страницы каталога"""
-        self.random_delay()
-        
+    def _subscribers_from_text(self, card_text: str) -> int:
+        """Извлечение числа подписчиков из текста одной карточки"""
+        # Паттерн: название + число + "подписчиков"
+        subscribers_match = _RE_SUBS.search(card_text)
+        if subscribers_match:
+            return self.normalize_subscribers(subscribers_match.group(1))
+
+        # Альтернативный поиск - просто большие числа
+        numbers = _RE_NUMBERS.findall(card_text)
+        if numbers:
+            # Берем самое большое число как количество подписчиков
+            max_num = max(int(n.replace(' ', '')) for n in numbers)
+            if max_num > 100:  # Минимальный порог для подписчиков
+                return max_num
+        return 0
+
+    def _fill_subscribers(self, items: List[Dict], card_texts: List[str]):
+        """Проставление подписчиков всем карточкам страницы разом.
+
+        С pandas числа извлекаются одним векторным C-проходом по всем
+        текстам страницы; карточки без прямого совпадения (и прогоны без
+        pandas) обрабатываются построчно.
+        """
+        if pd is not None and len(card_texts) > 1:
+            extracted = (pd.Series(card_texts, dtype='object')
+                         .str.extract(_RE_SUBS, expand=False)
+                         .str.replace(r'\s', '', regex=True))
+            values = pd.to_numeric(extracted, errors='coerce')
+            for item, text, value in zip(items, card_texts, values):
+                item['subscribers'] = int(value) if pd.notna(value) else self._subscribers_from_text(text)
+        else:
+            for item, text in zip(items, card_texts):
+                item['subscribers'] = self._subscribers_from_text(text)
+
+    async def parse_page(self, url: str) -> Tuple[List[Dict], bool]:
+        """Загрузка и парсинг одной страницы каталога"""
+        response = await self.make_request(url)
+        if not response or response.status_code != 200:
+            return [], False
+        return self.parse_html(response.text, url)
+
+    def parse_html(self, html: str, url: str) -> Tuple[List[Dict], bool]:
+        """Парсинг HTML одной страницы каталога (CPU-часть, без сети)"""
         try:
-            response = self.make_request(url)
-            if not response or response.status_code != 200:
-                return [], False
-                
-            parser = HTMLParser(response.text)
-            
+            parser = HTMLParser(html)
+
             # Отладочная информация
-            self.logger.info(f"🔍 Отладка: размер HTML - {len(response.text)} символов")
-            
+            self.logger.debug("🔍 Отладка: размер HTML - %d символов", len(html))
+
             # Сохраняем HTML для отладки (только первые 2000 символов)
-            html_preview = response.text[:2000]
-            self.logger.info(f"🔍 HTML превью: {html_preview}")
-            
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"🔍 HTML превью: {html[:2000]}")
+
             # Проверяем наличие капчи или блокировки
-            if "captcha" in response.text.lower() or "проверка" in response.text.lower():
+            if "captcha" in html.lower() or "проверка" in html.lower():
                 self.logger.error("❌ Обнаружена капча или проверка!")
                 return [], False
                 
-            if "404" in response.text or "не найден" in response.text.lower():
+            if "404" in html or "не найден" in html.lower():
                 self.logger.error("❌ Страница не найдена!")
                 return [], False
                 
-            if "429" in response.text or "авторизации" in response.text.lower():
+            if "429" in html or "авторизации" in html.lower():
                 self.logger.error("❌ Требуется авторизация или превышен лимит запросов!")
                 self.logger.error("💡 Попробуйте: увеличить задержку --delay 2.0 или использовать прокси")
                 return [], False
             
             # Ищем карточки каналов/чатов - правильные селекторы для TGStat
-            cards = parser.css('div[class*="peer"], div[class*="channel"], div[class*="rating"]')
+            cards = parser.css(_CARDS_SEL)
             self.logger.info(f"🔍 Найдено карточек с базовыми селекторами: {len(cards)}")
             
             if not cards:
-                # Альтернативные селекторы
-                cards = parser.css('div')  # Все div-ы для отладки
-                self.logger.info(f"🔍 Всего div элементов: {len(cards)}")
-                
-                # Ищем div-ы с ссылками на каналы
+                # Альтернативный путь: ищем сами ссылки на каналы и поднимаемся
+                # к родительской карточке — дешевле, чем перебирать все div-ы
+                anchors = parser.css(_CHANNEL_LINK_SEL)
+                self.logger.info(f"🔍 Найдено ссылок на каналы: {len(anchors)}")
+
                 cards_with_links = []
-                for div in cards:
-                    channel_links = div.css('a[href*="/channel/"], a[href*="/chat/"]')
-                    if channel_links:
-                        cards_with_links.append(div)
-                
+                seen_hrefs = set()
+                for anchor in anchors:
+                    card = anchor.parent
+                    # Поднимаемся на пару уровней до div-а карточки
+                    for _ in range(2):
+                        if card is None or card.tag == 'div':
+                            break
+                        card = card.parent
+                    if card is None:
+                        continue
+                    # id(узла) нестабилен — selectolax создает новую обертку
+                    # на каждый .parent, поэтому дедуплицируем по href первой
+                    # ссылки на канал внутри карточки
+                    first_link = card.css_first(_CHANNEL_LINK_SEL) or anchor
+                    href_key = first_link.attributes.get('href', '')
+                    if href_key not in seen_hrefs:
+                        seen_hrefs.add(href_key)
+                        cards_with_links.append(card)
+
                 cards = cards_with_links[:100]  # Ограничиваем до 100
-                self.logger.info(f"🔍 Найдено div-ов со ссылками на каналы: {len(cards)}")
+                self.logger.info(f"🔍 Найдено карточек со ссылками на каналы: {len(cards)}")
                 
             items = []
+            card_texts = []
             for i, card in enumerate(cards):
                 try:
                     # Отладочная информация для первых 3 карточек
-                    if i < 3:
-                        self.logger.info(f"🔍 Карточка {i+1}: {card.html[:200]}...")
-                    
+                    # (атрибуты узла, а не card.html — тот сериализует поддерево)
+                    if i < 3 and self.logger.isEnabledFor(logging.DEBUG):
+                        self.logger.debug(f"🔍 Карточка {i+1}: <{card.tag} {card.attributes}>")
+
                     # Извлечение названия и ссылки
                     title = ""
                     tgstat_link = ""
                     telegram_link = ""
                     
                     # Ищем ссылку на канал/чат внутри карточки
-                    channel_link = card.css_first('a[href*="/channel/"], a[href*="/chat/"]')
+                    channel_link = card.css_first(_CHANNEL_LINK_SEL)
                     if not channel_link:
                         if i < 3:  # Отладка для первых карточек
-                            self.logger.warning(f"🔍 Карточка {i+1}: не найдена ссылка на канал")
+                            self.logger.debug(f"🔍 Карточка {i+1}: не найдена ссылка на канал")
                         continue
                         
                     # Получаем название и ссылку
@@ -285,21 +463,25 @@ class TGStatParser:
                     
                     # Очищаем название от лишней информации
                     # Убираем всё после цифр подписчиков
-                    title = re.split(r'\d+[\d\s]*подписчик', title_raw)[0].strip()
+                    title = _RE_TITLE_SUBS.split(title_raw)[0].strip()
                     # Убираем категории типа "Новости и СМИ"
-                    title = re.split(r'[А-Я][а-я]+ и [А-Я][А-Я]+$', title)[0].strip()
+                    title = _RE_TITLE_CAT.split(title)[0].strip()
                     
                     if not title or not href:
                         continue
                     
-                    # Формируем полную ссылку на TGStat
-                    if href.startswith('/'):
+                    # Формируем полную ссылку на TGStat: базовый origin
+                    # фиксированный, поэтому обычный путь клеим конкатенацией;
+                    # urljoin остается только для протокол-относительных ссылок
+                    if href.startswith('//'):
                         tgstat_link = urljoin(self.base_url, href)
+                    elif href.startswith('/'):
+                        tgstat_link = self.base_url + href
                     else:
                         tgstat_link = href
                     
                     # Извлекаем username из ссылки TGStat
-                    username_match = re.search(r'/(channel|chat)/@([^/]+)', tgstat_link)
+                    username_match = _RE_USERNAME_URL.search(tgstat_link)
                     if username_match:
                         username = username_match.group(2)
                         telegram_link = f"https://t.me/{username}"
@@ -309,58 +491,55 @@ class TGStatParser:
                         telegram_link = f"{tgstat_link} (tgstat)"
                         is_channel = "/channel/" in tgstat_link
                     
-                    # Извлечение количества подписчиков из текста карточки
-                    subscribers = 0
-                    card_text = card.text()
-                    
-                    # Ищем числа подписчиков в тексте (обычно после названия)
-                    # Паттерн: название + число + "подписчиков"
-                    subscribers_match = re.search(r'(\d[\d\s]*\d|\d+)\s*подписчиков?', card_text)
-                    if not subscribers_match:
-                        # Альтернативный поиск - просто большие числа
-                        numbers = re.findall(r'(\d[\d\s]{3,})', card_text)
-                        if numbers:
-                            # Берем самое большое число как количество подписчиков
-                            max_num = max([int(n.replace(' ', '')) for n in numbers])
-                            if max_num > 100:  # Минимальный порог для подписчиков
-                                subscribers = max_num
-                    else:
-                        subscribers_text = subscribers_match.group(1)
-                        subscribers = self.normalize_subscribers(subscribers_text)
-                    
+                    # Текст для извлечения подписчиков: мелкий служебный блок,
+                    # а не все поддерево карточки; сами числа проставляются
+                    # пакетно после цикла
+                    subs_el = card.css_first(_SUBS_SEL)
+                    card_text = subs_el.text() if subs_el is not None else card.text()
+                    if subs_el is not None and not _RE_SUBS.search(card_text):
+                        # В служебном блоке числа не оказалось — берем весь текст
+                        card_text = card.text()
+
+                    # Интернируем повторяющиеся строки (названия, ссылки):
+                    # на длинных прогонах это экономит память, а сравнение
+                    # ключей в dict становится сравнением указателей
                     item = {
-                        'title': title,
-                        'subscribers': subscribers,
-                        'link': telegram_link,
+                        'title': sys.intern(title),
+                        'subscribers': 0,
+                        'link': sys.intern(telegram_link),
                         'type': 'channel' if is_channel else 'chat'
                     }
                     items.append(item)
+                    card_texts.append(card_text)
                     
                 except Exception as e:
                     self.logger.warning(f"⚠️ Ошибка парсинга карточки: {e}")
                     continue
-            
+
+            self._fill_subscribers(items, card_texts)
+
             # Проверяем наличие следующей страницы
             # Вместо поиска кнопки "следующая", проверяем количество найденных элементов
             # Если нашли 100 элементов (стандартное количество на странице), скорее всего есть еще страницы
-            has_next = len(items) >= 100 or bool(parser.css('a[href*="page="]'))
-            
+            # Один проход по дереву: ссылки пагинации нужны и для булевой
+            # проверки, и для поиска максимального номера страницы
+            page_links = parser.css(_PAGE_LINK_SEL)
+            has_next = len(items) >= 100 or bool(page_links)
+
             # Дополнительная проверка - ищем номера страниц больше текущего
             current_page = 1
             try:
-                current_page = int(re.search(r'page=(\d+)', url).group(1)) if 'page=' in url else 1
+                current_page = int(_RE_PAGE.search(url).group(1)) if 'page=' in url else 1
             except:
                 current_page = 1
-                
+
             # Ищем ссылки на страницы больше текущей
-            page_links = parser.css('a[href*="page="]')
-            max_page_found = current_page
-            for link in page_links:
-                href = link.attributes.get('href', '')
-                page_match = re.search(r'page=(\d+)', href)
-                if page_match:
-                    page_num = int(page_match.group(1))
-                    max_page_found = max(max_page_found, page_num)
+            max_page_found = max(
+                (int(m.group(1)) for link in page_links
+                 if (m := _RE_PAGE.search(link.attributes.get('href', '')))),
+                default=current_page
+            )
+            max_page_found = max(max_page_found, current_page)
             
             # Если есть ссылки на страницы больше текущей, значит есть следующие страницы
             if max_page_found > current_page:
@@ -375,51 +554,76 @@ class TGStatParser:
             self.logger.error(f"❌ Ошибка парсинга страницы {url}: {e}")
             return [], False
 
-    def build_url(self, category: str = "", url: str = "", page: int = 1, item_type: str = "channels") -> str:
-        """Построение URL для запроса"""
-        if url:
-            # Если передан прямой URL
-            if "page=" in url:
-                # Заменяем номер страницы
-                return re.sub(r'page=\d+', f'page={page}', url)
-            else:
-                # Добавляем параметр страницы
-                separator = "&" if "?" in url else "?"
-                return f"{url}{separator}page={page}"
-        else:
-            # Строим URL из категории
-            return f"{self.base_url}/ratings/{item_type}/{category}?page={page}"
+    def build_url_template(self, category: str = "", url: str = "", item_type: str = "channels") -> str:
+        """Шаблон URL с плейсхолдером {page} — строится один раз на прогон"""
+        # Частый случай (запуск по --category) — простая f-строка без регулярок
+        if not url:
+            return f"{self.base_url}/ratings/{item_type}/{category}?page={{page}}"
+
+        # Передан прямой URL
+        if "page=" not in url:
+            # Добавляем параметр страницы
+            separator = "&" if "?" in url else "?"
+            return f"{url}{separator}page={{page}}"
+
+        # Заменяем номер страницы на плейсхолдер
+        return _RE_PAGE_SUB.sub('page={page}', url)
 
-    def parse_catalog(self, category: str = "", url: str = "", pages: int = 1, item_type: str = "channels"):
+    async def parse_catalog(self, category: str = "", url: str = "", pages: int = 1,
+                            item_type: str = "channels", page_start: int = 1):
         """Главная функция парсинга каталога"""
-        self.logger.info(f"🚀 Начинаем парсинг: категория='{category}', url='{url}', страниц={pages}, тип='{item_type}'")
-        
-        for page_num in range(1, pages + 1):
-            page_url = self.build_url(category, url, page_num, item_type)
-            self.logger.info(f"📄 Страница {page_num}/{pages}: {page_url}")
-            
-            items, has_next = self.parse_page(page_url)
-            
-            if not items:
-                self.logger.warning(f"⚠️ Нет данных на странице {page_num}, завершаем...")
-                break
-            
-            # Сохраняем данные с дедупликацией
-            for item in items:
-                data_tuple = (item['title'], item['subscribers'], item['link'])
-                
-                if item['type'] == 'channel':
-                    self.channels_data.add(data_tuple)
-                else:
-                    self.chats_data.add(data_tuple)
-            
-            # Если нет следующей страницы, завершаем
-            if not has_next and page_num < pages:
-                self.logger.info(f"📄 Достигнута последняя страница ({page_num})")
-                break
-                
+        self.logger.info(f"🚀 Начинаем парсинг: категория='{category}', url='{url}', "
+                         f"страницы {page_start}-{page_start + pages - 1}, тип='{item_type}'")
+
+        await self.warmup()
+
+        # Конвейер producer/consumer: загрузчики кладут сырой HTML в
+        # очередь, воркеры парсят его, пока сеть тянет следующие страницы —
+        # сетевая и CPU-фазы перекрываются
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        url_template = self.build_url_template(category, url, item_type)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=16)
+
+        async def fetch_page(page_num: int):
+            page_url = url_template.format(page=page_num)
+            self.logger.info(f"📄 Страница {page_num}/{page_start + pages - 1}: {page_url}")
+            async with semaphore:
+                response = await self.make_request(page_url)
+            if response and response.status_code == 200:
+                await queue.put((page_num, page_url, response.text))
+            else:
+                self.logger.warning(f"⚠️ Нет данных на странице {page_num}")
+
+        async def parse_worker():
+            while True:
+                page_num, page_url, html = await queue.get()
+                try:
+                    items, _ = self.parse_html(html, page_url)
+                    if items:
+                        self._merge_items(items)
+                    else:
+                        self.logger.warning(f"⚠️ Нет данных на странице {page_num}")
+                finally:
+                    queue.task_done()
+
+        workers = [asyncio.create_task(parse_worker()) for _ in range(2)]
+        try:
+            await asyncio.gather(*(fetch_page(p) for p in range(page_start, page_start + pages)))
+            await queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+
         self.logger.info(f"✅ Парсинг завершен. Каналов: {len(self.channels_data)}, чатов: {len(self.chats_data)}")
 
+    def _merge_items(self, items: List[Dict]):
+        """Агрегация результатов страницы с дедупликацией по ссылке"""
+        for item in items:
+            target = self.channels_data if item['type'] == 'channel' else self.chats_data
+            current = target.get(item['link'])
+            if current is None or item['subscribers'] > current[1]:
+                target[item['link']] = (item['title'], item['subscribers'])
+
     def save_to_csv(self, output_dir: str = "./output"):
         """Сохранение результатов в CSV файлы"""
         output_path = Path(output_dir)
@@ -428,21 +632,52 @@ class TGStatParser:
         # Сохранение каналов
         if self.channels_data:
             channels_file = output_path / "channels.csv"
-            with open(channels_file, 'w', newline='', encoding='utf-8-sig') as f:
-                writer = csv.writer(f)
-                writer.writerow(['title', 'subscribers', 'link'])
-                writer.writerows(sorted(self.channels_data, key=lambda x: x[1], reverse=True))
+            self._write_csv(channels_file, self.channels_data)
             self.logger.info(f"💾 Каналы сохранены: {channels_file} ({len(self.channels_data)} записей)")
-        
+
         # Сохранение чатов
         if self.chats_data:
             chats_file = output_path / "chats.csv"
-            with open(chats_file, 'w', newline='', encoding='utf-8-sig') as f:
-                writer = csv.writer(f)
-                writer.writerow(['title', 'subscribers', 'link'])
-                writer.writerows(sorted(self.chats_data, key=lambda x: x[1], reverse=True))
+            self._write_csv(chats_file, self.chats_data)
             self.logger.info(f"💾 Чаты сохранены: {chats_file} ({len(self.chats_data)} записей)")
 
+    def _write_csv(self, path: Path, data: Dict[str, Tuple[str, int]]):
+        """Форматирование CSV в память и запись файла одним вызовом write"""
+        rows = [(title, subscribers, link) for link, (title, subscribers) in data.items()]
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(['title', 'subscribers', 'link'])
+        writer.writerows(heapq.nlargest(len(rows), rows, key=itemgetter(1)))
+        with open(path, 'w', buffering=1 << 20, newline='', encoding='utf-8-sig') as f:
+            f.write(buf.getvalue())
+
+
+def _merge_slab(dst: Dict[str, Tuple[str, int]], src: Dict[str, Tuple[str, int]]):
+    """Слияние словаря воркера в общий с правилом max-подписчиков"""
+    for link, (title, subscribers) in src.items():
+        current = dst.get(link)
+        if current is None or subscribers > current[1]:
+            dst[link] = (title, subscribers)
+
+
+def _scrape_slab(category: str, url: str, page_start: int, pages: int, item_type: str,
+                 proxy: Optional[str], delay_base: float, delay_jitter: float):
+    """Парсинг непрерывного диапазона страниц в отдельном процессе.
+
+    Каждый воркер владеет своей сессией и event loop, так что фаза
+    парсинга масштабируется по ядрам мимо GIL; результаты возвращаются
+    в основной процесс для слияния.
+    """
+    tgstat = TGStatParser(proxy=proxy, delay_base=delay_base, delay_jitter=delay_jitter)
+
+    async def run():
+        async with tgstat:
+            await tgstat.parse_catalog(category=category, url=url, pages=pages,
+                                       item_type=item_type, page_start=page_start)
+
+    asyncio.run(run())
+    return tgstat.channels_data, tgstat.chats_data
+
 
 def main():
     # Загрузка переменных окружения
@@ -464,6 +699,8 @@ def main():
     parser.add_argument("--delay", type=float, default=0.8, 
                         help="Базовая задержка между запросами")
     parser.add_argument("--proxy", help="Прокси для запросов")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Число процессов для парсинга страниц")
     parser.add_argument("--self-check", action="store_true", 
                         help="Быстрая проверка на 1 странице")
     
@@ -487,15 +724,38 @@ def main():
     # Создаем парсер и запускаем
     tgstat = TGStatParser(proxy=proxy, delay_base=delay_base, delay_jitter=delay_jitter)
     
+    async def run():
+        async with tgstat:
+            await tgstat.parse_catalog(
+                category=args.category or "",
+                url=args.url or "",
+                pages=args.pages,
+                item_type=args.type
+            )
+
     try:
         # Парсинг
-        tgstat.parse_catalog(
-            category=args.category or "",
-            url=args.url or "",
-            pages=args.pages,
-            item_type=args.type
-        )
-        
+        if args.workers > 1 and args.pages > 1:
+            # Шардируем диапазон страниц по процессам непрерывными кусками;
+            # основной процесс сливает словари воркеров по ссылке
+            workers = min(args.workers, args.pages)
+            slab = -(-args.pages // workers)  # ceil
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = []
+                start = 1
+                while start <= args.pages:
+                    count = min(slab, args.pages - start + 1)
+                    futures.append(pool.submit(
+                        _scrape_slab, args.category or "", args.url or "",
+                        start, count, args.type, proxy, delay_base, delay_jitter))
+                    start += count
+                for future in futures:
+                    channels, chats = future.result()
+                    _merge_slab(tgstat.channels_data, channels)
+                    _merge_slab(tgstat.chats_data, chats)
+        else:
+            asyncio.run(run())
+
         # Сохранение результатов
         tgstat.save_to_csv(args.outdir)
         